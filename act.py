@@ -21,11 +21,14 @@ EAT = "EAT"
 # (x, y) deltas for all 8 possible adjacent tiles (excluding (0,0)).
 XY_8_DELTAS = [[-1, -1], [-1, 0], [-1, 1], [0, -1], [0, 1], [1, -1], [1, 0], [1, 1]]
 XY_8_ICONS = ("↙", "←", "↖", "↓", "↑", "↘", "→", "↗")
+XY_8_ICON_BY_DELTA = dict(zip(map(tuple, XY_8_DELTAS), XY_8_ICONS))  # (x, y) -> icon.
 
 # Action_def: definitions of possible actions.
 # An action consists of:
 # - a verb (e.g. MOVE, EAT).
 # - some action-dependent arguments, expressed between brackets.
+# An action's (x, y) delta must stay within its radius: the world pads its grid
+# of things by MAX_RADIUS tiles (see World.__init__) and reads it without bounds checks.
 
 Action_def = namedtuple("Action_def", "radius energy_ratio")
 
@@ -48,6 +51,12 @@ ACTIONS_DEF = dict(
     ),
 )
 
+# Largest reach of any action (the width of the world's border).
+MAX_RADIUS = max(action_def.radius for action_def in ACTIONS_DEF.values())
+
+# Energy ratio of each action, by name.
+ENERGY_RATIOS = {name: action_def.energy_ratio for name, action_def in ACTIONS_DEF.items()}
+
 VOID_ACTION = (
     NONE,
     np.array([])
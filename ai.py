@@ -170,9 +170,9 @@ def copy_submap(map, position, radius=1):
     # Get 'submap_origin'.
     submap_origin = [submap_x0, submap_y0]
 
-    # Copy subrectangle on submap.
-    submap = np.copy(
-        map[submap_x0:submap_x1+1, submap_y0:submap_y1+1]
+    # Copy subrectangle on submap (widening boolean maps to hold OFF_BOARD).
+    submap = map[submap_x0:submap_x1+1, submap_y0:submap_y1+1].astype(
+        np.result_type(map.dtype, OFF_BOARD)
     )
 
     # Mark central position as OFF_BOARD.
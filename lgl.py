@@ -8,12 +8,22 @@
 import yaml
 from curses import wrapper
 import time
-import argparse
 import os
+import sys
+import types
+import json
+import tempfile
+from pathlib import Path
 
 # Modules.
 import world as w
 import ui
+import ai
+
+# Constants.
+# Use libyaml's C bindings when available (same safe semantics, faster).
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SEED_FILE = Path("aux/seed.txt")  # Seed of latest simulation run.
 
 
 def read_simulation_definition():
@@ -27,89 +37,106 @@ def read_simulation_definition():
     route = "{}{}.yaml".format(path, world)
     assert os.path.exists(route), \
         "File {} not found.".format(route)
-
-    # Read .yaml config file.
-    with open(route, 'r') as stream:
-        try:
-            simulation_def = yaml.safe_load(stream)
-        except yaml.YAMLError as exc:
-            print(exc)
+    cache_route = "aux/{}.cache.json".format(world)
+
+    simulation_def = load_cached_definition(cache_route, route)
+    if simulation_def is None:
+        # Read .yaml config file.
+        with open(route, 'r') as stream:
+            try:
+                simulation_def = yaml.load(stream, Loader=YAML_LOADER)
+            except yaml.YAMLError as exc:
+                print(exc)
+            else:
+                # Cache it (before tag conversion, so it stays JSON-serializable).
+                store_cached_definition(cache_route, simulation_def)
 
     # Convert non-standard tags.
     convert_non_standard_yaml_tags(simulation_def)
     return simulation_def
 
 
+def load_cached_definition(cache_route, route):
+    # Return the cached sim. definition if it is up to date with its .yaml file,
+    # or None if it is missing, stale or unreadable (to parse the .yaml again).
+    try:
+        if os.path.getmtime(cache_route) >= os.path.getmtime(route):
+            # Cached copy is up to date: read it as (much faster) JSON.
+            with open(cache_route, 'r') as stream:
+                simulation_def = json.load(stream)
+        else:
+            simulation_def = None
+    except (OSError, ValueError):
+        # No cache yet, or a corrupt one.
+        simulation_def = None
+    return simulation_def
+
+
+def store_cached_definition(cache_route, simulation_def):
+    # Write the cache to a temporary file next to it, then move it into place,
+    # so that an interrupted or failed write never leaves a partial cache behind.
+    tmp_route = None
+    try:
+        fd, tmp_route = tempfile.mkstemp(dir=os.path.dirname(cache_route), suffix=".tmp")
+        with os.fdopen(fd, 'w') as stream:
+            json.dump(simulation_def, stream)
+        os.replace(tmp_route, cache_route)
+    except (OSError, TypeError, ValueError):
+        # Not cached (the .yaml file will just be parsed again next time).
+        if tmp_route is not None and os.path.exists(tmp_route):
+            os.remove(tmp_route)
+
+
 def convert_non_standard_yaml_tags(sim_def):
     # This function transform the following string references to 
     # their corresponding values:
-    # color, intensity
+    # color, intensity, ai functions
 
     # WORLD
     # color and intensity: values found in ui.py module.
-    sim_def["world"]["bg_color"] = ui.color_name_to_color[
-        sim_def["world"]["bg_color"]
-    ]
-    sim_def["world"]["bg_intensity"] = ui.intensity_name_to_intensity[
-        sim_def["world"]["bg_intensity"]
-    ]
+    world = sim_def["world"]
+    world["bg_color"], world["bg_intensity"] = ui.resolve_color(
+        world["bg_color"], world["bg_intensity"]
+    )
 
     # TILES
     # color and intensity: values found in ui.py module.
-    sim_def["tiles"]["color"] = ui.color_name_to_color[
-        sim_def["tiles"]["color"]
-    ]
-    sim_def["tiles"]["intensity"] = ui.intensity_name_to_intensity[
-        sim_def["tiles"]["intensity"]
-    ]
+    tiles = sim_def["tiles"]
+    tiles["color"], tiles["intensity"] = ui.resolve_color(
+        tiles["color"], tiles["intensity"]
+    )
 
     # BLOCKS
     for block in sim_def["blocks"]:
         # color and intensity: values found in ui.py module.
-        block["thing_settings"]["color"] = ui.color_name_to_color[
-            block["thing_settings"]["color"]
-        ]
-        block["thing_settings"]["intensity"] = ui.intensity_name_to_intensity[
-            block["thing_settings"]["intensity"]
-        ]
+        settings = block["thing_settings"]
+        settings["color"], settings["intensity"] = ui.resolve_color(
+            settings["color"], settings["intensity"]
+        )
 
     # AGENTS
     for agent in sim_def["agents"]:
         # color and intensity: values found in ui.py module.
-        agent["thing_settings"]["color"] = ui.color_name_to_color[
-            agent["thing_settings"]["color"]
-        ]
-        agent["thing_settings"]["intensity"] = ui.intensity_name_to_intensity[
-            agent["thing_settings"]["intensity"]
-        ]
+        settings = agent["thing_settings"]
+        settings["color"], settings["intensity"] = ui.resolve_color(
+            settings["color"], settings["intensity"]
+        )
         # ai settings: functions found in ai.py module.
-        if agent["ai_settings"]["perception"] is not None:
-            doc_aux = """
-            perception: !!python/name:ai.{}
-            """.format(
-                agent["ai_settings"]["perception"]
-            )
-            agent["ai_settings"]["perception"] = yaml.load(
-                doc_aux, Loader=yaml.Loader
-            )["perception"]
-        if agent["ai_settings"]["action"] is not None:
-            doc_aux = """
-            action: !!python/name:ai.{}
-            """.format(
-                agent["ai_settings"]["action"]
-            )
-            agent["ai_settings"]["action"] = yaml.load(
-                doc_aux, Loader=yaml.Loader
-            )["action"]
-        if agent["ai_settings"]["learning"] is not None:
-            doc_aux = """
-            learning: !!python/name:ai.{}
-            """.format(
-                agent["ai_settings"]["learning"]
-            )
-            agent["ai_settings"]["learning"] = yaml.load(
-                doc_aux, Loader=yaml.Loader
-            )["learning"]
+        for ai_setting in ("perception", "action", "learning"):
+            if agent["ai_settings"][ai_setting] is not None:
+                agent["ai_settings"][ai_setting] = getattr(
+                    ai, agent["ai_settings"][ai_setting]
+                )
+
+
+def load_seed():
+    # Return the seed stored by the previous simulation.
+    return float(SEED_FILE.read_bytes())
+
+
+def store_seed(seed):
+    # Store the seed used, so that the simulation can be repeated.
+    SEED_FILE.write_bytes(f"{seed}".encode())
 
 
 def generate_simulation_definition(args):
@@ -122,23 +149,17 @@ def generate_simulation_definition(args):
 
     # (2) Process now arguments passed, overriding initial settings.
 
-    # Check for aux/ folder.
-    if not os.path.exists("aux"):
-        os.makedirs("aux")
-
     # Arguments related to RANDOM SEED:
     if args.repeat:
         # Seed must be reused from previous simulation.
-        with open("aux/seed.txt", "r") as f:
-            seed = float(f.read())
+        seed = load_seed()
         seed_source = "PREVIOUS"
     elif args.seed:
         # A seed was passed.
         seed = float(args.seed)
         seed_source = "PASSED"
         # Store the seed passed.
-        with open("aux/seed.txt", "w") as f:
-            f.write(str(seed))
+        store_seed(seed)
     else:
         # No seed specified: check if set in world settings or generate one.
         seed = simulation_def["world"]["random_seed"]
@@ -150,8 +171,7 @@ def generate_simulation_definition(args):
         else:
             seed = float(seed)
         # Store the new seed.
-        with open("aux/seed.txt", "w") as f:
-            f.write(str(seed))
+        store_seed(seed)
 
     # Set now the seed in simulation_def.
     simulation_def["world"]["random_seed"] = seed
@@ -164,8 +184,10 @@ def generate_simulation_definition(args):
     return simulation_def
 
 
-def process_args():
-    # Process arguments passed, returning usable class:
+def build_parser():
+    # Build the parser of program's arguments.
+    import argparse  # Lazy import: only needed when arguments are passed.
+
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group()
     """
@@ -188,47 +210,83 @@ def process_args():
         "-s", "--seed",
         help="random seed used in simulation (overrides config. file)"
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run simulation without user interface (no terminal needed)"
+    )
+    return parser
+
+
+_parser = None  # Arguments' parser, built on first use.
+
+
+def process_args():
+    # Process arguments passed, returning usable class:
+    global _parser
+    if len(sys.argv) == 1:
+        # No arguments passed: skip building the parser.
+        return types.SimpleNamespace(
+            pause=None, repeat=None, seed=None, headless=False)
+    if _parser is None:
+        _parser = build_parser()
     # Return args:
-    arguments = parser.parse_args()
+    arguments = _parser.parse_args()
     return arguments
 
 
 def produce_final_results(world):
     print("Lil' Grid Lab v0.1")
-    print("{:<20}{}".format("- Started:", time_0))
-    print("{:<20}{}".format("- Ended:", time.ctime()))
-    print("{:<20}{:,} [{}]".format(
-        "- Steps run:", world.current_step, world.end_reason
-        ))
-    print("{:<20}{}".format("- Random seed used:", world.random_seed))
+    print(f"{'- Started:':<20}{time_0}")
+    print(f"{'- Ended:':<20}{time.ctime()}")
+    print(f"{'- Steps run:':<20}{world.current_step:,} [{world.end_reason}]")
+    print(f"{'- Random seed used:':<20}{world.random_seed}")
 
 
 def main_loop(stdscr, world):
     '''
-    :param stdscr: standard screen created by curses' wrapper.
+    :param stdscr: standard screen created by curses' wrapper
+    (None to run headless, without UI).
     :param world: the world on which the simulation will run.
     :return: (nothing).
     '''
 
     # Initialize UI.
-    u_i = ui.UI(stdscr, world)
+    if stdscr is not None:
+        u_i = ui.UI(stdscr, world)
+        draw = u_i.draw
+    else:
+        draw = None
+
+    # Bind loop's functions to locals (world.spf is NOT: user can change it).
+    is_end_loop = world.is_end_loop
+    step = world.step
+    monotonic = time.monotonic
+    sleep = time.sleep
 
     # Main world loop.
     end_loop = False
+    next_tick = monotonic()  # Deadline of the current step.
     while not end_loop:
         # Display the world as it is now.
-        u_i.draw()
+        if draw is not None:
+            draw()
 
         # Check conditions to go on.
-        end_loop = world.is_end_loop()
+        end_loop = is_end_loop()
         if not end_loop:
             # Evolve world by one time-fixed step.
-            t_start = time.time()
-            world.step()
-            if world.spf is not None:
+            step()
+            spf = world.spf
+            if spf is not None:
                 # No full-speed mode; keep time-step duration.
-                t_end = time.time()
-                time.sleep(max(0, world.spf - (t_end - t_start)))
+                next_tick += spf
+                delay = next_tick - monotonic()
+                if delay > 0:
+                    sleep(delay)
+                else:
+                    # Step overrun (or back from pause / full-speed): resync.
+                    next_tick = monotonic()
 
     # Exit program.
     # TODO: Produce final results.
@@ -237,11 +295,17 @@ if __name__ == '__main__':
     # Main program.
     time_0 = time.ctime()  # Start time.
 
+    # Check for aux/ folder (seed and cache files).
+    os.makedirs("aux", exist_ok=True)
+
     # Create the world and start "curses-wrapped" environment.
     arguments = process_args()  # Capture arguments passed.
     simulation_def = generate_simulation_definition(arguments)
     world = w.World(simulation_def)
-    wrapper(main_loop, world)
+    if arguments.headless:
+        main_loop(None, world)
+    else:
+        wrapper(main_loop, world)
 
     # Quit program.
     produce_final_results(world)
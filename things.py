@@ -13,7 +13,6 @@ from collections import namedtuple
 # Modules.
 import ai
 import act
-import ui
 
 # Constants
 RANDOM_POSITION = None  # Old value was tuple (None, None)
@@ -35,32 +34,47 @@ RESPAWNABLE = 'RESPAWNABLE'  # Regular loss; resurrected after death at random l
 
 class Thing:
     # Root class containing the common attributes for all classes.
+    __slots__ = ("name", "aspect", "color", "intensity", "position", "tid")
+    is_agent = False  # Class-level flag, cheaper to test than isinstance().
+
     def __init__(self, thing_def):
         self.name = thing_def["name"]  # Name of the thing.
         self.aspect = thing_def["aspect"]  # Text character to display.
         self.color = thing_def["color"]  # Color for the character.
         self.intensity = thing_def["intensity"]  # Intensity to apply.
         self.position = thing_def["initial_position"]  # Its position in the world.
+        self.tid = None  # Its id in the world's grid of things (set by World when first placed).
 
 
 class Tile(Thing):
-    pass  # Use root class'.
+    __slots__ = ()  # Use root class'.
 
 
 class Block(Thing):
-    num_blocks = 0
-
     # It passively occupies one tile, never moving.
-    def __init__(self, thing_def):
-        # Initialize inherited attributes.
-        super().__init__(thing_def)
-        # Update class variable.
-        Block.num_blocks += 1
+    __slots__ = ()  # Use root class'.
+    num_blocks = 0  # Number of blocks in the world (set by World).
 
 
 class Agent(Thing):
     # Default class for Agents.
-    num_agents = 0
+    __slots__ = (
+        # Energy.
+        "energy", "max_energy", "bite_power", "step_cost", "move_cost",
+        "action_deltas", "recycling", "acceptable_energy_drop",
+        # AI.
+        "perception", "action", "learning",
+        # Recycling.
+        "original_color", "original_intensity",
+        # Internal state.
+        "steps", "current_state", "current_energy_delta",
+        "touch_maps", "negative_touch_map", "positive_touch_map",
+        "chosen_action", "chosen_action_success", "action_icon", "learn_result",
+        # World bookkeeping.
+        "idx",
+    )
+    is_agent = True
+    num_agents = 0  # Number of agents in the world (set by World).
 
     def __init__(self,
                  thing_settings,
@@ -70,7 +84,7 @@ class Agent(Thing):
         # Initialize inherited attributes, customizing 'name'.
         super().__init__(thing_settings)
         if agent_suffix is not None:
-            self.name = "{}.{}".format(self.name, str(agent_suffix))
+            self.name = f"{self.name}.{agent_suffix}"
 
         # Attributes related to energy.
         self.energy = energy_settings["initial_energy"]
@@ -78,6 +92,10 @@ class Agent(Thing):
         self.bite_power = energy_settings["bite_power"]
         self.step_cost = energy_settings["step_cost"]
         self.move_cost = energy_settings["move_cost"]
+        self.action_deltas = {  # Energy cost of each action type (<0), IF made.
+            action_type: self.move_cost * energy_ratio
+            for action_type, energy_ratio in act.ENERGY_RATIOS.items()
+        }
         self.recycling = energy_settings["recycling_type"]
         self.acceptable_energy_drop = 2*self.step_cost + self.move_cost  # Heuristic threshold for UI highlights.
 
@@ -90,27 +108,30 @@ class Agent(Thing):
         self.original_color = self.color
         self.original_intensity = self.intensity
 
+        # Surrounding tiles' energy changes. Both maps share one buffer,
+        # allocated once and just wiped afterwards.
+        self.touch_maps = np.zeros((2, 3, 3))
+        self.negative_touch_map = self.touch_maps[0]
+        self.positive_touch_map = self.touch_maps[1]
+
         # Initialize internal variables.
         self.initialize_state()
-
-        Agent.num_agents += 1
+        self.idx = None  # Index in its world's agent arrays (set by World).
 
     def initialize_state(self):
         # Initialize agent-specific attributes.
         self.steps = 0
         self.current_state = None
         self.current_energy_delta = 0
-        self.negative_touch_map = np.zeros([3, 3])
-        self.positive_touch_map = np.zeros([3, 3])
+        self.reset_touch_maps()
         self.chosen_action = act.VOID_ACTION
         self.chosen_action_success = True
         self.action_icon = ""
         self.learn_result = None
 
     def reset_touch_maps(self):
-        # Set all surrounding tiles to 0.
-        self.negative_touch_map[:] = 0
-        self.positive_touch_map[:] = 0
+        # Set all surrounding tiles to 0 (in both maps).
+        self.touch_maps.fill(0.0)
 
     def pre_step(self):
         # Reset agents' step variables before a step is run.
@@ -136,26 +157,27 @@ class Agent(Thing):
             # ENERGY:
             # Keep within 0 and agent's max_energy.
             prev_energy = self.energy
-            self.energy = max(min(self.energy + energy_delta, self.max_energy), 0)
+            energy = prev_energy + energy_delta
+            if energy > self.max_energy:
+                energy = self.max_energy
+            elif energy < 0:
+                energy = 0
+            self.energy = energy
             energy_used = self.energy - prev_energy  # Actual impact on agent.
             self.current_energy_delta += energy_used
             # Update 'touch_maps'.
-            if delta_source_position is None:
-                delta_source_position = self.position
             if energy_used < 0:
                 touch_map = self.negative_touch_map
             else:
                 touch_map = self.positive_touch_map
-            touch_map[
-                1 + delta_source_position[0] - self.position[0],
-                1 + delta_source_position[1] - self.position[1]
-            ] += energy_used
+            if delta_source_position is None:
+                touch_map[1, 1] += energy_used
+            else:
+                x, y = self.position
+                x_source, y_source = delta_source_position
+                touch_map[1 + x_source - x, 1 + y_source - y] += energy_used
 
-            # ASPECT:
-            # Check for death condition:
-            if self.energy <= 0:
-                # Update aspect (RESPAWNEABLE condition handled by world).
-                self.color, self.intensity = ui.DEAD_AGENT_COLOR_INTENSITY
+            # ASPECT: death condition is handled by world for all agents at once.
 
         return energy_used
 
@@ -174,12 +196,8 @@ class Agent(Thing):
         self.reset_touch_maps()
 
         # UI: Capture action's icon, if any.
-        action = self.chosen_action[1].tolist()
-        if action in act.XY_8_DELTAS:
-            action_idx = act.XY_8_DELTAS.index(action)
-            self.action_icon = act.XY_8_ICONS[action_idx]
-        else:
-            self.action_icon = ""
+        self.action_icon = act.XY_8_ICON_BY_DELTA.get(
+            tuple(self.chosen_action[1].tolist()), "")
 
         # TODO: Update aspect (character(s) displayed, color...)?
 
@@ -13,6 +13,8 @@ import datetime
 from curses import wrapper
 import shutil
 import time
+import functools
+import types
 
 # Modules
 pass
@@ -33,18 +35,23 @@ colors = (
 color_names = (
     "BLACK", "BLUE", "CYAN", "GREEN", "MAGENTA", "RED", "WHITE", "YELLOW"
     )
-color_name_to_color = {}
-for n, c in zip(color_names, colors):
-    color_name_to_color[n] = c
+color_name_to_color = types.MappingProxyType(dict(zip(color_names, colors)))
 
 NORMAL = 0  # No offset for normal colors (1..8).
 BRIGHT = 8  # Offset to get brighter colors, assuming COLORS >= 16 .
 MAX_COLORS = 16  # The number of predefined colors to try to use.
 
-intensity_name_to_intensity = {
+intensity_name_to_intensity = types.MappingProxyType({
     "NORMAL": NORMAL,
     "BRIGHT": BRIGHT
-}
+})
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_color(color_name, intensity_name):
+    # Return (color, intensity) values for the given names, e.g. from .yaml files.
+    return color_name_to_color[color_name], intensity_name_to_intensity[intensity_name]
+
 
 # Constants based on curses to manage keycaps:
 KEY_DOWN = curses.KEY_DOWN  # Down-arrow
@@ -124,9 +131,25 @@ class UI:
         # self.reshape_blocks(self.world.blocks)  # TODO: remove code
 
         # Produce AUX strings.
+        self.tile_texts = [tile.aspect + self.spc_str for tile in self.world.tile_types]  # By tile type.
+        self.ground_rows = [  # The (never changing) row of tiles for each y.
+            "".join(self.tile_texts[t] for t in self.world.ground_types[:, y].tolist())
+            for y in range(self.world.height)
+        ]
+        self.board_drawn = False  # Whether the board needs a full redraw (False) or just updates.
+        self.highlight_position = None  # Center of tiles highlighted on last board draw.
         self.tracker_frame_1 = "┌" + "─" * (self.tracker_width - 2) + "┐"
         self.tracker_frame_2 = "│" + " " * (self.tracker_width - 2) + "│"
         self.tracker_frame_3 = "└" + "─" * (self.tracker_width - 2) + "┘"
+        self.tracker_label_energy = "{:<14}".format('Energy:')
+        self.tracker_label_ai = "{:<14}".format('AI:')
+        self.tracker_label_blank = "{:<14}".format(' ')
+        self.tracker_label_action = "{:<14}".format('Action:')
+        self.tracker_label_carrying = "{:<14}".format('Carrying:')
+        self.tracker_label_message = "{:<14}".format('Message:')
+        self.tracker_label_explored = "{:<14}".format('Explored:')
+        self.tracker_label_plc_holdr = "{:<14}".format('Plc_holdr:')
+        self.tracker_right_line = " Lil' Grid Lab 0.1 "
 
         # Initialize curses settings.
         self.stdscr.nodelay(False)  # Enable waiting for user input stop.
@@ -134,6 +157,7 @@ class UI:
 
         # COLORS: try to initialize curses' pairs; set UI colors as defined.
         self.has_colors, self.color_pairs = self.init_all_pairs()
+        self.pair_attrs = [curses.color_pair(p) for p in self.color_pairs]  # Flat cache of pair()'s results.
         self.window_bg = UI_def["window_bg"]
         self.header_fg = UI_def["header_fg"]
         self.header_bg = UI_def["header_bg"]
@@ -144,6 +168,28 @@ class UI:
         self.tracker_fg = UI_def["tracker_fg"]
         self.tracker_bg = UI_def["tracker_bg"]
 
+        # Frequently used pairs (of fixed colors).
+        world_bg = self.world.bg_color + self.world.bg_intensity
+        tile = self.world.tile_types[0]  # All tiles share the world's tiles definition.
+        self.ground_pair = self.pair(tile.color + tile.intensity, world_bg)
+        self.highlight_tile_pair = self.pair(WHITE + BRIGHT, world_bg)
+        self.energy_rise_pair = self.pair(ENERGY_RISE_COLOR + BRIGHT, ENERGY_RISE_COLOR + NORMAL)
+        self.energy_drop_pair = self.pair(ENERGY_DROP_COLOR + BRIGHT, ENERGY_DROP_COLOR + NORMAL)
+        self.tracker_pair = self.pair(self.tracker_fg, self.tracker_bg)
+        self.tracker_bright_pair = self.pair(self.tracker_fg + BRIGHT, self.tracker_bg)
+        self.tracker_red_pair = self.pair(RED, self.tracker_bg)
+        self.tracker_bright_red_pair = self.pair(RED + BRIGHT, self.tracker_bg)
+
+        # Blocks never move: precompute their (aspect, attributes) by position.
+        self.block_draw_info = {}
+        for block in self.world.blocks:
+            block_fg = block.color + block.intensity
+            if block.aspect[0] == " ":  # Generic full block style.
+                pair = self.pair(block_fg, block_fg)
+            else:
+                pair = self.pair(block_fg, world_bg)
+            self.block_draw_info[tuple(block.position)] = (block.aspect, pair | curses.A_BOLD)
+
         # Create curses windows (extending width by N extra columns for safe addstr()...).
         self.header = curses.newwin(1, self.board_width + self.safe_columns, 0, 0)
         self.board = curses.newwin(self.world.height, self.board_width + self.safe_columns, 1, 1)
@@ -162,6 +208,14 @@ class UI:
         self.footer.bkgd(" ", left_pair)
         self.tracker.bkgd(" ", right_pair)
 
+        # Tracker's box never changes: draw it once on a pad, to be copied over the tracker on each draw.
+        self.tracker_box = curses.newpad(self.tracker_height, self.tracker_width + self.safe_columns)
+        self.tracker_box.bkgd(" ", right_pair)
+        self.tracker_box.addstr(0, 0, self.tracker_frame_1, self.tracker_bright_pair)
+        for y in range(1, self.tracker_height - 1):
+            self.tracker_box.addstr(y, 0, self.tracker_frame_2, self.tracker_bright_pair)
+        self.tracker_box.addstr(self.tracker_height - 1, 0, self.tracker_frame_3, self.tracker_bright_pair)
+
         self.footer.nodelay(True)  # Establish the "nodelay" mode.
         stdscr.refresh()
 
@@ -180,34 +234,33 @@ class UI:
 
         color_pairs = np.full((MAX_COLORS, MAX_COLORS), 0)
         if has_colors:
-            pair = 1  # Skip pair 0 ("wired" to black and white)
             # Terminal has colors: initialize pairs for curses
-            for fg in range(MAX_COLORS):  # colors ranging from 0 to 15
-                for bg in range(MAX_COLORS):  # colors ranging from 0 to 15
-                    if curses.COLORS >= 16:
-                        # Full allocation of all 16x16 pair combinations
-                        curses.init_pair(pair, fg, bg)
-                        color_pairs[fg, bg] = pair
-                        pair += 1
-                    else:
-                        # Restrict to 8x8 pair combinations within the 16x16 shape
-                        if (fg <= 8 and bg <= 8):
-                            # Allocate new basic pair
-                            curses.init_pair(pair, fg, bg)
-                            color_pairs[fg, bg] = pair
-                            pair += 1
-                        else:
-                            # Reuse lower preallocated pairs
-                            color_pairs[fg, bg] = color_pairs[max(fg, fg - 8), max(bg, bg - 8)]
+            fg, bg = np.indices((MAX_COLORS, MAX_COLORS))  # colors ranging from 0 to 15
+            if curses.COLORS >= 16:
+                # Full allocation of all 16x16 pair combinations
+                allocated = np.full((MAX_COLORS, MAX_COLORS), True)
+            else:
+                # Restrict to 8x8 pair combinations within the 16x16 shape
+                allocated = (fg < 8) & (bg < 8)
+            # Number pairs consecutively, skipping pair 0 ("wired" to black and white)
+            color_pairs[allocated] = np.arange(1, np.count_nonzero(allocated) + 1)
+            for pair, pair_fg, pair_bg in zip(color_pairs[allocated].tolist(),
+                                              fg[allocated].tolist(),
+                                              bg[allocated].tolist()):
+                curses.init_pair(pair, pair_fg, pair_bg)
+            # Reuse lower preallocated pairs for bright colors (if not allocated)
+            basic_pairs = color_pairs[fg % 8, bg % 8]
+            color_pairs[~allocated] = basic_pairs[~allocated]
 
         else:
             # Terminal has NO colors: leave ALL pairs as 0 (curses' default pair for fg/bg)
             pass
 
-        return has_colors, color_pairs
+        # Return pairs as a flat list of ints, indexed by fg * MAX_COLORS + bg.
+        return has_colors, color_pairs.ravel().tolist()
 
     def pair(self, fg, bg):
-        return curses.color_pair(self.color_pairs[fg, bg])
+        return self.pair_attrs[fg * MAX_COLORS + bg]
 
     def handle_terminal_size(self, stdscr):
         if self.resize_term:
@@ -291,75 +344,101 @@ class UI:
         return answer
 
     def draw_board(self):
-        # Update board state.
-        x_tracked, y_tracked = self.world.tracked_agent.position
-
-        for y in range(self.world.height - 1, -1, -1):
-            x_screen = 0
-            for x in range(self.world.width):
-                thing = self.world.things[x, y]
-                if thing is None:
-                    # Emtpy TILE here. May be highlighted.
-                    tile = self.world.ground[x, y]
-                    text = tile.aspect + self.spc_str
-                    if (x_tracked - 1 <= x <= x_tracked + 1) and (y_tracked - 1 <= y <= y_tracked + 1):
-                        # Hightlight tile (contiguous to tracked agent).
-                        color, intensity, blink = WHITE, BRIGHT, curses.A_BLINK
-                    else:
-                        # Regular tile.
-                        color, intensity, blink = tile.color, tile.intensity, curses.A_NORMAL
-                    pair = self.pair(color + intensity, self.world.bg_color + self.world.bg_intensity)
-                    self.board.addstr(self.world.height - y - 1, x_screen, text, pair | blink)
-                else:
-                    # Some AGENT/BLOCK here.
-                    if thing in self.world.blocks:
-                        # A BLOCK:
-                        t_aspect = thing.aspect
-                        if t_aspect[0] == " ":  # Generic full block style.
-                            pair = self.pair(thing.color + thing.intensity, thing.color + thing.intensity)
-                        else:
-                            pair = self.pair(thing.color + thing.intensity,
-                                             self.world.bg_color + self.world.bg_intensity)
-                        # Display the block.
-                        self.board.addstr(self.world.height - y - 1, x_screen, t_aspect, pair | curses.A_BOLD)
-                    else:
-                        # An AGENT:
-                        if thing.current_energy_delta > 0:
-                            # Highlight energy increase.
-                            pair = self.pair(ENERGY_RISE_COLOR + BRIGHT,
-                                             ENERGY_RISE_COLOR + NORMAL)
-                        elif thing.current_energy_delta < thing.acceptable_energy_drop:
-                            # Highlight huge energy drop.
-                            pair = self.pair(ENERGY_DROP_COLOR + BRIGHT,
-                                             ENERGY_DROP_COLOR + NORMAL)
-                        else:
-                            # Otherwise, use agent's and world's regular color/intensity.
-                            pair = self.pair(thing.color + thing.intensity,
-                                             self.world.bg_color + self.world.bg_intensity)
-                        if 0 < thing.energy < thing.max_energy * LOW_ENERGY_THRESHOLD:
-                            pair = pair | curses.A_BLINK
-                        # Display the agent and the required blanks right after.
-                        self.board.addstr(self.world.height - y - 1, x_screen, thing.aspect, pair | curses.A_BOLD)
-                        pair = self.pair(thing.color + thing.intensity, self.world.bg_color + self.world.bg_intensity)
-                        self.board.addstr(self.spc_str, pair)
-                x_screen += 1 + self.spc_len  # X axis must follow specific spacing.
+        # Update board state: ground and blocks (all of them on first call,
+        # only tiles changed since then afterwards), highlights and agents on top.
+        world = self.world
+        x_tracked, y_tracked = world.tracked_agent.position
+        x_step = 1 + self.spc_len  # X axis must follow specific spacing.
+        row_base = world.height - 1  # Board row of y == 0 (rows grow downwards).
+        bg = world.bg_color + world.bg_intensity  # World's background, same for all the frame.
+        # Local bindings for the loops below.
+        addstr = self.board.addstr
+        spc_str = self.spc_str
+        tile_texts = self.tile_texts
+        ground_pair = self.ground_pair
+        pair_attrs = self.pair_attrs  # As in pair(), indexed by fg * MAX_COLORS + bg.
+        A_BOLD = curses.A_BOLD
+        A_BLINK = curses.A_BLINK
+
+        # Tiles to highlight: empty ones contiguous to tracked agent.
+        highlights = [
+            (x, y)
+            for x in range(max(0, x_tracked - 1), min(x_tracked + 2, world.width))
+            for y in range(max(0, y_tracked - 1), min(y_tracked + 2, world.height))
+            if world.thing_ids[x, y] < 0
+        ]
+
+        if not self.board_drawn:
+            # GROUND: Empty TILES, one string per row.
+            for y in range(world.height):
+                addstr(row_base - y, 0, self.ground_rows[y], ground_pair)
+            # BLOCKS: never moving, so drawn just once.
+            blocks = self.block_draw_info.items()
+            self.board_drawn = True
+        else:
+            # Restore tiles changed since last draw, including previous highlights.
+            cells = world.dirty_cells
+            if self.highlight_position is not None:
+                x_0, y_0 = self.highlight_position
+                cells.update(
+                    (x, y)
+                    for x in range(max(0, x_0 - 1), min(x_0 + 2, world.width))
+                    for y in range(max(0, y_0 - 1), min(y_0 + 2, world.height))
+                )
+            blocks = []
+            for cell in cells:
+                draw_info = self.block_draw_info.get(cell)
+                if draw_info is not None:
+                    blocks.append((cell, draw_info))
+                elif world.thing_ids[cell] < 0:
+                    x, y = cell
+                    addstr(row_base - y, x * x_step, tile_texts[world.ground_types[cell]], ground_pair)
+        world.dirty_cells.clear()
+        self.highlight_position = (x_tracked, y_tracked)
+
+        # Hightlight empty tiles contiguous to tracked agent.
+        for x, y in highlights:
+            addstr(row_base - y, x * x_step, tile_texts[world.ground_types[x, y]],
+                   self.highlight_tile_pair | A_BLINK)
+
+        # BLOCKS:
+        for (x, y), (t_aspect, attr) in blocks:
+            addstr(row_base - y, x * x_step, t_aspect, attr)
+
+        # AGENTS: always drawn, as their colors follow their energy.
+        energy_rise_pair = self.energy_rise_pair
+        energy_drop_pair = self.energy_drop_pair
+        for agent in world.agents:
+            x, y = agent.position
+            agent_pair = pair_attrs[(agent.color + agent.intensity) * MAX_COLORS + bg]  # Agent's regular pair.
+            if agent.current_energy_delta > 0:
+                # Highlight energy increase.
+                pair = energy_rise_pair
+            elif agent.current_energy_delta < agent.acceptable_energy_drop:
+                # Highlight huge energy drop.
+                pair = energy_drop_pair
+            else:
+                # Otherwise, use agent's and world's regular color/intensity.
+                pair = agent_pair
+            if 0 < agent.energy < agent.max_energy * LOW_ENERGY_THRESHOLD:
+                pair = pair | A_BLINK
+            # Display the agent and the required blanks right after.
+            addstr(row_base - y, x * x_step, agent.aspect, pair | A_BOLD)
+            addstr(spc_str, agent_pair)
+
         self.board.noutrefresh()
 
     def draw_tracker(self):
         # Define colors.
-        fg_color_pair = self.pair(self.tracker_fg, self.tracker_bg)
-        fg_bright_color_pair = self.pair(self.tracker_fg + BRIGHT, self.tracker_bg)
-        red_color_pair = self.pair(RED, self.tracker_bg)
-        bright_red_color_pair = self.pair(RED + BRIGHT, self.tracker_bg)
+        fg_color_pair = self.tracker_pair
+        fg_bright_color_pair = self.tracker_bright_pair
+        red_color_pair = self.tracker_red_pair
+        bright_red_color_pair = self.tracker_bright_red_pair
         tracked_agent = self.world.tracked_agent
         agent_color_pair = self.pair(tracked_agent.color + tracked_agent.intensity, self.tracker_bg)
 
-        # Clean up and draw a fresh Box.
-        self.tracker.erase()
-        self.tracker.addstr(0, 0, self.tracker_frame_1, fg_bright_color_pair)
-        for y in range(1, self.tracker_height - 1):
-            self.tracker.addstr(y, 0, self.tracker_frame_2, fg_bright_color_pair)
-        self.tracker.addstr(self.tracker_height - 1, 0, self.tracker_frame_3, fg_bright_color_pair)
+        # Clean up with a fresh Box.
+        self.tracker_box.overwrite(self.tracker, 0, 0, 0, 0, self.tracker_height - 1, self.tracker_width)
 
         # Tracked agent: header.
         self.tracker.addstr(0, 1, "[ ", fg_bright_color_pair)
@@ -369,10 +448,8 @@ class UI:
         n_blocks = 5
         n_greens = round(n_blocks * energy_percent / 100)
         n_reds = n_blocks - n_greens
-        for i in range(n_greens):
-            self.tracker.addstr("▉", fg_color_pair)
-        for i in range(n_reds):
-            self.tracker.addstr("▉", red_color_pair)
+        self.tracker.addstr("▉" * n_greens, fg_color_pair)
+        self.tracker.addstr("▉" * n_reds, red_color_pair)
         self.tracker.addstr(" {}% ]".format(energy_percent), fg_bright_color_pair)
 
         # AUX info: printed for trackinkd purposes if not empty.
@@ -380,7 +457,7 @@ class UI:
             self.tracker.addstr(1, 2, self.world.aux_msg, fg_color_pair)
 
         # Tracked agent: Energy.
-        self.tracker.addstr(2, 2, "{:<14}".format('Energy:'), fg_color_pair)
+        self.tracker.addstr(2, 2, self.tracker_label_energy, fg_color_pair)
         if tracked_agent.energy > tracked_agent.max_energy * LOW_ENERGY_THRESHOLD:
             pair = fg_bright_color_pair
         else:
@@ -393,19 +470,19 @@ class UI:
             self.tracker.addstr("+{:.1f}".format(tracked_agent.current_energy_delta), fg_bright_color_pair)
 
         # Tracked agent: AI.
-        self.tracker.addstr(3, 2, "{:<14}".format("AI:"), fg_color_pair)
-        self.tracker.addstr("{}".format(tracked_agent.action.__name__), fg_bright_color_pair)
-        self.tracker.addstr(4, 2, "{:<14}".format(" "), fg_color_pair)
-        self.tracker.addstr("{}".format(tracked_agent.perception.__name__), fg_bright_color_pair)
-        self.tracker.addstr(5, 2, "{:<14}".format(" "), fg_color_pair)
-        self.tracker.addstr("{}".format(tracked_agent.learning.__name__), fg_bright_color_pair)
+        self.tracker.addstr(3, 2, self.tracker_label_ai, fg_color_pair)
+        self.tracker.addstr(tracked_agent.action.__name__, fg_bright_color_pair)
+        self.tracker.addstr(4, 2, self.tracker_label_blank, fg_color_pair)
+        self.tracker.addstr(tracked_agent.perception.__name__, fg_bright_color_pair)
+        self.tracker.addstr(5, 2, self.tracker_label_blank, fg_color_pair)
+        self.tracker.addstr(tracked_agent.learning.__name__, fg_bright_color_pair)
 
         # Tracked agent: Action.
         if tracked_agent.chosen_action_success:
             pair = fg_bright_color_pair
         else:
             pair = bright_red_color_pair
-        self.tracker.addstr(7, 2, "{:<14}".format('Action:'), fg_color_pair)
+        self.tracker.addstr(7, 2, self.tracker_label_action, fg_color_pair)
         self.tracker.addstr("{} {} {}".format(
             tracked_agent.chosen_action[0],
             tracked_agent.action_icon,
@@ -414,38 +491,52 @@ class UI:
             pair)
 
         # Tracked agent: Other information.
-        self.tracker.addstr(8, 2, "{:<14}".format('Carrying:'), fg_color_pair)
-        self.tracker.addstr("{}".format('[]'), fg_bright_color_pair)
-        self.tracker.addstr(9, 2, "{:<14}".format('Message:'), fg_color_pair)
-        self.tracker.addstr("{}".format('[]'), fg_bright_color_pair)
-        self.tracker.addstr(10, 2, "{:<14}".format('Explored:'), fg_color_pair)
-        self.tracker.addstr("{}".format('-'), fg_bright_color_pair)
-        self.tracker.addstr(11, 2, "{:<14}".format('Plc_holdr:'), fg_color_pair)
-        self.tracker.addstr("{}".format('-'), fg_bright_color_pair)
+        self.tracker.addstr(8, 2, self.tracker_label_carrying, fg_color_pair)
+        self.tracker.addstr('[]', fg_bright_color_pair)
+        self.tracker.addstr(9, 2, self.tracker_label_message, fg_color_pair)
+        self.tracker.addstr('[]', fg_bright_color_pair)
+        self.tracker.addstr(10, 2, self.tracker_label_explored, fg_color_pair)
+        self.tracker.addstr('-', fg_bright_color_pair)
+        self.tracker.addstr(11, 2, self.tracker_label_plc_holdr, fg_color_pair)
+        self.tracker.addstr('-', fg_bright_color_pair)
 
         # Rest of Things (agents, blocks?).
         self.tracker.addstr(2, self.tracking_right_column, " Top Agents     Energy ", fg_bright_color_pair | curses.A_REVERSE)
         y = 3  # Initial line.
-        agents_list = self.world.agents
-        for agent in filter(lambda a: a.action is not None, agents_list):
-            agent_color_pair = self.pair(agent.color + agent.intensity, self.tracker_bg)
+        n_rows = self.tracker_height - 2 - y  # Maximal length of list on screen.
+        # Top agents (with some mind) by energy: just the ones fitting on screen are picked and sorted.
+        world = self.world
+        candidates = np.flatnonzero(world.agent_has_mind)
+        energies = world.agent_energy[candidates]
+        if len(candidates) > n_rows:
+            top = np.argpartition(-energies, n_rows - 1)[:n_rows]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.lexsort((candidates[top], -energies[top]))]  # By energy, then creation order.
+        agents_list = [world.agents_by_idx[idx] for idx in candidates[top].tolist()]
+        # Local bindings for the loop below.
+        addstr = self.tracker.addstr
+        pair_attrs = self.pair_attrs  # As in pair(), indexed by fg * MAX_COLORS + bg.
+        tracker_bg = self.tracker_bg
+        right_column = self.tracking_right_column
+        name_length = self.name_length
+        for agent in agents_list:
+            agent_color_pair = pair_attrs[(agent.color + agent.intensity) * MAX_COLORS + tracker_bg]
             if agent == tracked_agent:
                 prefix = "▶ "
                 pair = fg_bright_color_pair | curses.A_BOLD
             else:
                 prefix = "  "
                 pair = fg_color_pair
-            self.tracker.addstr(y, self.tracking_right_column, prefix, fg_bright_color_pair)
-            self.tracker.addstr(agent.aspect, agent_color_pair)
-            self.tracker.addstr(" {:<11}".format(agent.name[:self.name_length]), pair)
+            addstr(y, right_column, prefix, fg_bright_color_pair)
+            addstr(agent.aspect, agent_color_pair)
+            addstr(" {:<11}".format(agent.name[:name_length]), pair)
             if agent.energy > agent.max_energy * LOW_ENERGY_THRESHOLD:
                 pair = fg_bright_color_pair
             else:
                 pair = bright_red_color_pair
-            self.tracker.addstr(" {:>6.2f}".format(agent.energy), pair)
+            addstr(" {:>6.2f}".format(agent.energy), pair)
             y += 1
-            if y > self.tracker_height - 3:  # Maximal length of list on screen.
-                break
 
         # Tracker's footer.
         time_run = str(datetime.timedelta(seconds=self.world.seconds_run()))
@@ -454,7 +545,7 @@ class UI:
         else:
             fps = "{:,.1f} fps ".format(self.world.fps)
         left_line = " Step {:,} ({}) {}".format(self.world.current_step, time_run, fps)
-        right_line = " Lil' Grid Lab 0.1 "
+        right_line = self.tracker_right_line
         self.tracker.addstr(self.tracker_height - 1, 1, left_line, fg_bright_color_pair | curses.A_REVERSE)
         self.tracker.addstr(self.tracker_height - 1, self.tracker_width - 1 - len(right_line), right_line,
                             fg_bright_color_pair)
@@ -8,6 +8,8 @@
 import numpy as np
 import random
 import time
+import operator
+import fractions
 
 # Modules.
 import things
@@ -18,6 +20,10 @@ import ui
 # Constants:
 WORLD_DEFAULT_FPS = 5  # Fall-back world speed (in frames-per-second).
 WORLD_DEFAULT_SPF = 1 / WORLD_DEFAULT_FPS  # (the same in seconds-per-frame).
+AGENT_ENERGY = operator.attrgetter("energy")  # Sorting key for agents.
+EMPTY_ID = -1  # Thing id of empty tiles.
+WALL_ID = -2  # Thing id of the border around the world (never empty, holds no thing).
+BORDER = max(act.MAX_RADIUS, 1)  # Width of that border: whatever any action can reach.
 
 ###############################################################
 
@@ -45,6 +51,9 @@ class World:
             "World initialization received a random_seed of value 'None'"
         self.random_seed = seed
         random.seed(seed)
+        # NumPy generator for batched draws, seeded from the same seed
+        # (hash() maps each float seed to the same integer on every run).
+        self.rng = np.random.RandomState(hash(seed) % 2**32)
 
         self.paused = world_def["initial_pause"]  # Whether the user has paused simulation.
         self.pause_step = world_def["pause_step"]
@@ -61,28 +70,53 @@ class World:
         self.creation_time = time.time
         self.current_step = 0
 
+        # Actions: function executing each type of action on the world.
+        self.action_handlers = {
+            act.NONE: self.execute_none,
+            act.MOVE: self.execute_move,
+            act.EAT: self.execute_eat,
+        }
+
         # Layout:
         self.n_blocks_rnd = world_def["n_blocks_rnd"]
 
-        # A grid for agents and blocks [references].
-        self.things = np.full((self.width, self.height), None)
+        # A grid for agents and blocks [ids, EMPTY_ID if empty], and the things by id.
+        # It is padded with a BORDER of WALL_ID, so tiles within reach need no bounds checks;
+        # thing_ids is its inner view, indexed by world coordinates.
+        self.thing_ids_padded = np.full(
+            (self.width + 2 * BORDER, self.height + 2 * BORDER), WALL_ID, dtype=np.int32)
+        self.thing_ids = self.thing_ids_padded[BORDER:-BORDER, BORDER:-BORDER]
+        self.thing_ids[:] = EMPTY_ID
+        self.padded_height = self.height + 2 * BORDER
+        self.padded_offset = BORDER * self.padded_height + BORDER  # Flat index of (0, 0).
+        self.things_by_id = []
         # A grid tracking energy [floats] on each tile.
         self.energy_map = np.zeros((self.width, self.height))
-        # A grid tracking occupation [1 / 0] of each tile.
-        self.occupation_bitmap = np.full(
-            (self.width, self.height), 1)  # Unoccupied tile.
-        # A grid tracking aspect (a character) of Things on each tile (or "").
-        self.occupation_map = np.full(
-            (self.width, self.height), "")
-
-        # Put TILES on the ground.
-        self.ground = np.full((self.width, self.height), None)  # Fill in the basis of the world.
-        for x in range(self.width):
-            for y in range(self.height):
-                # Create tile.
-                tile = things.Tile(tiles_def)
-                self.ground[x, y] = tile
-                self.occupation_map[x, y] = tile.aspect
+        # A grid tracking occupation [True (free) / False (occupied)] of each tile.
+        self.occupation_bitmap = np.ones((self.width, self.height), dtype=bool)  # Unoccupied tile.
+        # A grid tracking aspect of Things on each tile (or the tile's), as codes [uint8]:
+        # aspects_by_code turns them back into aspects (see aspect_code()).
+        self.occupation_codes = np.zeros((self.width, self.height), dtype=np.uint8)
+        self.code_by_aspect = {}
+        self.aspects_by_code = []
+        # Tiles whose occupant changed since last drawn (the UI clears it).
+        self.dirty_cells = set()
+
+        # Put TILES on the ground: a grid of tile types [uint8] indexing tile_types.
+        # All tiles are equal, so a single type is shared by all positions.
+        tile = things.Tile(tiles_def)
+        self.tile_types = [tile]
+        self.ground_types = np.zeros((self.width, self.height), dtype=np.uint8)  # Fill in the basis of the world.
+        self.tile_code = self.aspect_code(tile.aspect)  # The first code: 0, as occupation_codes start.
+        # Flat views (sharing data) of the grids above, indexed by x * height + y
+        # (or by x * padded_height + y + padded_offset, for the padded thing ids).
+        self.thing_ids_flat = self.thing_ids_padded.ravel()
+        self.energy_flat = self.energy_map.ravel()
+        self.occupation_bitmap_flat = self.occupation_bitmap.ravel()
+        self.occupation_codes_flat = self.occupation_codes.ravel()
+        # Free tiles, as a list (to pick a random one) and each one's index in it (to remove it).
+        self.free_tiles = [(x, y) for x in range(self.width) for y in range(self.height)]
+        self.free_tile_index = {cell: i for i, cell in enumerate(self.free_tiles)}
 
         # Put AGENTS in the world.
         self.agents = []  # List of all types of agent in the world.
@@ -102,9 +136,13 @@ class World:
                     agent_suffix
                     )
                 # Put agent in the world on requested position, relocating on colisions (on failure, Agent is ignored).
-                success = self.place_at(agent, agent.position, relocate=True)
+                position = agent.position
+                if position is not None and not (0 <= position[0] < self.width and 0 <= position[1] < self.height):
+                    position = things.RANDOM_POSITION  # Off the world: relocate, as if occupied.
+                success = self.place_at(agent, position, relocate=True)
                 if success:
                     # Update agents list and tracked_agent (only the first time).
+                    agent.idx = len(self.agents)  # Its index in agent arrays.
                     self.agents.append(agent)
                     if agent.is_alive():
                         self.n_active_agents += 1
@@ -115,6 +153,22 @@ class World:
                     # TODO: Track issue.
                     pass
 
+        # Agents' numeric state, also kept as arrays indexed by agent.idx
+        # (Structure-of-Arrays) for whole-population operations.
+        self.agent_energy = np.array([agent.energy for agent in self.agents], dtype=float)
+        # Static masks: agents with some mind; agents respawned after 'death'.
+        self.agent_has_mind = np.array(
+            [agent.action is not None for agent in self.agents], dtype=bool)
+        self.agent_respawnable = np.array(
+            [agent.recycling == things.RESPAWNABLE for agent in self.agents], dtype=bool)
+        # Agents taking the 'dead' aspect when out of energy, and those already showing it.
+        self.agent_mortal = np.array(
+            [agent.recycling not in (things.EVERLASTING, things.RESPAWNABLE) for agent in self.agents],
+            dtype=bool)
+        self.agent_dead = np.zeros(len(self.agents), dtype=bool)
+        self.agents_by_idx = list(self.agents)  # Stable order ('self.agents' is sorted by energy).
+        self.update_dead_aspects()  # Agents starting with no energy show as dead from the start.
+
         # Put in some BLOCKS.
         self.blocks = []
         for b_def in blocks_def:  # List of all types of block in the world.
@@ -126,20 +180,21 @@ class World:
                 # Specified No. of blocks.
                 n_random_blocks = b_def["n_instances"]
 
-            n = 0
-            while n < n_random_blocks:
-                block = things.Block(b_def["thing_settings"])
-                success = self.place_at(block)  # Put in random position if possible (fail condition ignored).
-                if success:
-                    # Update blocks list.
-                    self.blocks.append(block)
-                else:
-                    # Ignore block and report incidence.
-                    # TODO: Track issue.
-                    pass
-                n += 1
+            # Draw random positions for all blocks at once among free tiles
+            # (blocks not fitting in the world are ignored).
+            # TODO: Track issue when not all blocks fit.
+            n_fitting_blocks = int(min(n_random_blocks, len(self.free_tiles)))
+            picks = self.rng.choice(len(self.free_tiles), size=n_fitting_blocks, replace=False)
+            positions = [self.free_tiles[i] for i in picks.tolist()]  # Before place_at() reorders them.
+            new_blocks = [things.Block(b_def["thing_settings"]) for _ in positions]
+            for block, position in zip(new_blocks, positions):
+                self.place_at(block, position)
+            # Update blocks list.
+            self.blocks.extend(new_blocks)
 
         # Final settings.
+        things.Block.num_blocks = len(self.blocks)
+        things.Agent.num_agents = len(self.agents)
         self.total_energy = self.energy_map.sum()  # Total from all agents.
         self.aux_msg = ""
 
@@ -160,6 +215,13 @@ class World:
 
         self.original_fps = self.fps
         self.original_spf = self.spf
+        # World's speed for seconds_run(), as an exact fraction (of the fps as written):
+        # original_fps, or WORLD_DEFAULT_FPS if original_fps was None.
+        if self.original_fps is not None:
+            referential_fps = self.original_fps
+        else:
+            referential_fps = WORLD_DEFAULT_FPS
+        self.referential_fps = fractions.Fraction(str(referential_fps))
 
     def update_fps(self, fps_factor):
         if fps_factor is None:
@@ -188,29 +250,26 @@ class World:
         # Assumptions:
         # - Since speed can vary at user's request, original_spf is assumed.
         # - And if original_fps was None, WORLD_DEFAULT_SPF us assumed.
-
-        if self.original_spf is not None:
-            referential_spf = self.original_spf
-        else:
-            referential_spf = WORLD_DEFAULT_SPF
-
-        return (self.current_step * referential_spf) // 1
+        # Exact arithmetic (see initialize_fps()) avoids float roundoff on long simulations.
+        return self.current_step // self.referential_fps
 
     def place_at(self, thing, position=things.RANDOM_POSITION, relocate=False):
         # Put "things" in the world at certain position, updating the thing and
-        # the world's internal status (self.things and self.energy_map).
+        # the world's internal status (self.thing_ids and self.energy_map).
         #
         # If position is not defined, find a random free place and move the Thing there.
         # If position is defined,
         #       if not occupied, move a Thing to position;
         #       if occupied, relocate randomly if allowed by 'relocate', or fail otherwise.
+        # Positions may be given as any (x, y) pair; they are kept as (x, y) tuples.
         # Result of action: (True: success; False: fail).
+        placed = thing.tid is not None  # Already in the world (an unplaced Thing may hold its initial_position).
         if position == things.RANDOM_POSITION:
             # position not defined; try to find a random one.
             position, success = self.find_free_tile()
         else:
             # position is defined; check if it is empty (or the current one).
-            if self.tile_is_empty(position) or position == thing.position:
+            if self.tile_is_empty(position) or (placed and position == thing.position):
                 # position is empty (or already the current one): success!
                 success = True
             elif relocate:
@@ -222,32 +281,39 @@ class World:
 
         if success:
             # The move is possible, (re)locate Thing.
-            if thing.position != things.RANDOM_POSITION:
+            if placed:
                 # The Thing was already in the world; clear out old place.
-                self.things[thing.position[0], thing.position[1]] = None
-                self.energy_map[thing.position[0], thing.position[1]] = 0
-                self.occupation_bitmap[
-                    thing.position[0], thing.position[1]
-                    ] = 1  # Unoccupied tile.
-                self.occupation_map[
-                    thing.position[0], thing.position[1]
-                    ] = \
-                    self.ground[
-                    thing.position[0], thing.position[1]  # Tile's aspect.
-                    ]
-
-            self.things[position[0], position[1]] = thing
-            if type(thing) is things.Agent:
-                self.energy_map[position[0], position[1]] = thing.energy
-            self.occupation_bitmap[
-                position[0], position[1]
-                ] = 0  # Occupied tile.
-            self.occupation_map[
-                position[0], position[1]
-                ] = thing.aspect
-            thing.position = position
-
-        elif thing.position != things.RANDOM_POSITION and position == things.RANDOM_POSITION:
+                x_old, y_old = thing.position
+                i_old = x_old * self.height + y_old  # Index on flat grids.
+                self.thing_ids_flat[x_old * self.padded_height + y_old + self.padded_offset] = EMPTY_ID
+                self.energy_flat[i_old] = 0
+                self.occupation_bitmap_flat[i_old] = True  # Unoccupied tile.
+                self.occupation_codes_flat[i_old] = self.tile_code  # Tile's aspect.
+                self.dirty_cells.add((x_old, y_old))
+                self.free_tile_index[(x_old, y_old)] = len(self.free_tiles)
+                self.free_tiles.append((x_old, y_old))
+
+            x, y = position
+            # Remove the tile from free ones, swapping the last one into its place.
+            i = self.free_tile_index.pop((x, y))
+            last_tile = self.free_tiles.pop()
+            if i < len(self.free_tiles):
+                self.free_tiles[i] = last_tile
+                self.free_tile_index[last_tile] = i
+            i_new = x * self.height + y  # Index on flat grids.
+            if thing.tid is None:
+                # First time in the world: register it.
+                thing.tid = len(self.things_by_id)
+                self.things_by_id.append(thing)
+            self.thing_ids_flat[x * self.padded_height + y + self.padded_offset] = thing.tid
+            if thing.is_agent:
+                self.energy_flat[i_new] = thing.energy
+            self.occupation_bitmap_flat[i_new] = False  # Occupied tile.
+            self.occupation_codes_flat[i_new] = self.aspect_code(thing.aspect)
+            thing.position = (x, y)
+            self.dirty_cells.add((x, y))
+
+        elif placed and position == things.RANDOM_POSITION:
             # The move is not possible, BUT the thing was already in the world,
             # and target position didn't matter:
             # Leave the thing where it was.
@@ -255,39 +321,37 @@ class World:
 
         return success
 
+    def aspect_code(self, aspect):
+        # Return the code of an aspect in occupation_codes, assigning a new one if needed.
+        code = self.code_by_aspect.get(aspect)
+        if code is None:
+            code = len(self.aspects_by_code)
+            assert code <= np.iinfo(np.uint8).max, "Too many different aspects in the world."
+            self.code_by_aspect[aspect] = code
+            self.aspects_by_code.append(aspect)
+        return code
+
+    @property
+    def occupation_map(self):
+        # The grid with the aspect shown on each tile, decoded from occupation_codes
+        # (read like the former attribute: world.occupation_map[x, y]).
+        return np.array(self.aspects_by_code)[self.occupation_codes]
+
     def tile_is_empty(self, position):
-        # Check if a given position exists within world's limits and is free.
+        # Check if a given position exists within world's limits and is free
+        # (positions off the world, within the reach of actions, hit the WALL_ID border).
         x, y = position
-        if (0 <= x <= self.width - 1) and (0 <= y <= self.height - 1):
-            result = self.things[x, y] is None
-        else:
-            result = False
-        return result
+        return self.thing_ids_flat[x * self.padded_height + y + self.padded_offset] == EMPTY_ID
 
     def find_free_tile(self):
-        # Try to find a tile that is empty in the world.
+        # Try to find a tile that is empty in the world, picking randomly among the free ones.
         # Result of action: (True: success; False: fail).
-
-        # First, try a random tile.
-        x = random.randint(0, self.width - 1)
-        y = random.randint(0, self.height - 1)
-        found = self.tile_is_empty([x, y])
-
-        x0, y0 = x, y  # Starting position to search from.
-        success = True
-        while not found and success:
-            x = (x + 1) % self.width  # Increment x not exceeding width.
-            if x == 0:  # When x is back to 0, increment y not exceeding height.
-                y = (y + 1) % self.height
-            if self.tile_is_empty([x, y]):  # Check "success" condition.
-                found = True
-            elif (x, y) == (x0, y0):  # Failed if loop over the world is complete.
-                success = False
-
-        if success:
-            position = [x, y]
+        if self.free_tiles:
+            position = self.free_tiles[random.randrange(len(self.free_tiles))]
+            success = True
         else:
             position = things.RANDOM_POSITION
+            success = False
         return position, success
 
     def step(self):
@@ -297,15 +361,11 @@ class World:
         # Prepare world's info for step.
         self.pre_step()
 
-        # Run step over all "living and acting" agents.
-        for agent in filter(lambda a:
-                            a.is_alive(),
-                            self.agents):
-            # Sanity check for a.energy (which can change within loop).
-            assert agent.energy > 0, \
-                "Agent {} with energy {} was active in step() loop.".format(
-                    agent.name, agent.energy
-                )
+        # Run step over all "living and acting" agents, i.e. is_alive() ones
+        # (checked inline, as energy can change within loop).
+        for agent in self.agents:
+            if agent.energy <= 0 or agent.action is None:
+                continue
             # Request action from agent based on world state.
             action = agent.choose_action(world=self)
             # Try to execute action.
@@ -334,9 +394,9 @@ class World:
         # Return the number of active agents left (energy > 0)
 
         # Call all agents' post_step() here.
-        n_active_agents = 0
+        respawns = (self.agent_energy <= 0) & self.agent_respawnable  # Dead RESPAWNABLE agents.
         for agent in self.agents:
-            if agent.energy <= 0 and agent.recycling == things.RESPAWNABLE:
+            if respawns[agent.idx]:
                 # Respawn dead agent on new random place.
                 _ = self.update_agent_energy(agent, energy_delta=None)
                 result = self.place_at(agent)
@@ -345,19 +405,20 @@ class World:
             else:
                 # Regular post_step()
                 agent.post_step()
-            if agent.is_alive():
-                n_active_agents += 1
+        # Update aspect of agents that just died (typically none).
+        self.update_dead_aspects()
+        # Count active agents, i.e. 'is_alive()' ones.
+        n_active_agents = int(np.count_nonzero((self.agent_energy > 0) & self.agent_has_mind))
 
-        # Update rest of world's internal info.
-        self.total_energy = self.energy_map.sum()
-        assert np.isclose(  # Sanity check of energy totals.
+        # Update rest of world's internal info (self.total_energy is kept by update_agent_energy()).
+        assert np.isclose(  # Sanity check of energy totals (dropped, like any assert, by 'python -O').
             self.total_energy,
-            sum(a.energy for a in self.agents)
+            self.agent_energy.sum()
             ), "Total energy mismatch ({}) between world.energy_map and \
                 world.agents.".format(
-                self.total_energy - sum(a.energy for a in self.agents)
+                self.total_energy - self.agent_energy.sum()
                 )
-        self.agents.sort(key=lambda x: x.energy, reverse=True)
+        self.agents.sort(key=AGENT_ENERGY, reverse=True)
         self.current_step += 1
         if self.current_step == self.pause_step:
             self.paused = True
@@ -365,6 +426,15 @@ class World:
 
         self.n_active_agents = n_active_agents  # Update count of active agents.
 
+    def update_dead_aspects(self):
+        # Give the 'dead' aspect to mortal agents out of energy not showing it yet.
+        new_deaths = np.flatnonzero(
+            (self.agent_energy <= 0) & self.agent_mortal & ~self.agent_dead)
+        for idx in new_deaths.tolist():
+            agent = self.agents_by_idx[idx]
+            agent.color, agent.intensity = ui.DEAD_AGENT_COLOR_INTENSITY
+        self.agent_dead[new_deaths] = True
+
     def execute_action(self, agent, action):
         # Check if the action is feasible and execute it on world and agents.
         # Acting 'agent': it may update position, energy attributes,
@@ -373,77 +443,75 @@ class World:
 
         # Initialize internal variables.
         action_type, action_arguments = action
-        action_energy_ratio = act.ACTIONS_DEF[action_type].energy_ratio
+        execute = self.action_handlers.get(action_type)
+        if execute is None:
+            raise Exception(
+                'Invalid action type passed [{}] by agent {}.'.format(
+                    action_type, agent.name
+                    )
+                )
 
         # Calculate energy cost IF action is actually made.
-        action_delta = agent.move_cost * action_energy_ratio  # <0
-        # Manage abandoned_position, for cases when the agent moves.
-        abandoned_position = None
+        action_delta = agent.action_deltas[action_type]  # <0
 
         if agent.energy + action_delta + agent.step_cost < 0:
             # Not enough energy for the move and the step cost.
             success = False
-            action_delta = 0
-            energy_delta = action_delta + agent.step_cost
-            self.update_agent_energy(agent, energy_delta)
+            self.update_agent_energy(agent, agent.step_cost)
+        else:
+            success = execute(agent, action_arguments, action_delta)
 
-        elif action_type == act.NONE:
-            # Rest action.
-            success = True
-            energy_delta = action_delta + agent.step_cost
-            self.update_agent_energy(agent, energy_delta)
-
-        elif action_type == act.MOVE:
-            # Update locations [try to], checking if destination tile is free.
-            success = self.place_at(agent,
-                                    [agent.position[0] + action_arguments[0],
-                                     agent.position[1] + action_arguments[1]]
-                                    )
-            if not success:
-                action_delta = 0
-                # TODO: Penalize collisions?
-            energy_delta = action_delta + agent.step_cost
-            self.update_agent_energy(agent, energy_delta)
-
-        elif action_type == act.EAT:
-            # Firstly, update energy spent in step for whichever result,
-            # (to allow full replenishment).
-            _ = self.update_agent_energy(agent, agent.step_cost)  # Dropped energy is lost.
-
-            prey = self.things[agent.position[0] + action_arguments[0],
-                               agent.position[1] + action_arguments[1]]
-            if prey in self.agents:
-                # Viable action. Try to take energy from prey.
-                max_possible_bite = min(
-                    agent.bite_power,
-                    agent.max_energy - agent.energy)
-                energy_taken = self.update_agent_energy(
-                    prey,
-                    -max_possible_bite,
-                    agent.position)
-                action_delta += - energy_taken
-                success = action_delta > 0
-                # Give energy to eating agent.
-                _ = self.update_agent_energy(
-                    agent,
-                    action_delta,
-                    prey.position)
-            else:
-                # Failed action.
-                success = False
-                action_delta = 0
+        # Update agent on success of action.
+        agent.chosen_action_success = success
 
-            energy_delta = action_delta + agent.step_cost
+    def execute_none(self, agent, action_arguments, action_delta):
+        # Rest action. Return its success.
+        self.update_agent_energy(agent, action_delta + agent.step_cost)
+        return True
+
+    def execute_move(self, agent, action_arguments, action_delta):
+        # Update locations [try to], checking if destination tile is free.
+        # Return its success.
+        x, y = agent.position
+        dx, dy = action_arguments
+        success = self.place_at(agent, (x + int(dx), y + int(dy)))
+        if not success:
+            action_delta = 0
+            # TODO: Penalize collisions?
+        self.update_agent_energy(agent, action_delta + agent.step_cost)
+        return success
 
+    def execute_eat(self, agent, action_arguments, action_delta):
+        # Try to take energy from an adjacent agent. Return its success.
+
+        # Firstly, update energy spent in step for whichever result,
+        # (to allow full replenishment).
+        _ = self.update_agent_energy(agent, agent.step_cost)  # Dropped energy is lost.
+
+        x, y = agent.position
+        dx, dy = action_arguments
+        prey_id = self.thing_ids_flat[(x + int(dx)) * self.padded_height + y + int(dy) + self.padded_offset]
+        prey = self.things_by_id[prey_id] if prey_id >= 0 else None
+        if prey is not None and prey.is_agent:
+            # Viable action. Try to take energy from prey.
+            headroom = agent.max_energy - agent.energy
+            max_possible_bite = agent.bite_power if agent.bite_power <= headroom else headroom
+            energy_taken = self.update_agent_energy(
+                prey,
+                -max_possible_bite,
+                agent.position)
+            action_delta += - energy_taken
+            success = action_delta > 0
+            # Give energy to eating agent.
+            _ = self.update_agent_energy(
+                agent,
+                action_delta,
+                prey.position)
         else:
-            raise Exception(
-                'Invalid action type passed [{}] by agent {}.'.format(
-                    action_type, agent.name
-                    )
-                )
+            # Failed action.
+            success = False
 
-        # Update agent on success of action.
-        agent.chosen_action_success = success
+        return success
 
     def update_agent_energy(self, agent,
                             energy_delta=None,
@@ -451,7 +519,8 @@ class World:
         # Execute agent's method to update its 'energy' state by
         # 'energy_delta',
         # or agent's respawn method if 'energy_delta' is None.
-        # Then update the world's internal status (self.energy_map).
+        # Then update the world's internal status (self.energy_map,
+        # self.agent_energy).
         # Return actual energy change for the agent.
 
         if energy_delta is not None:
@@ -460,7 +529,11 @@ class World:
                 energy_source_position)
         else:
             energy_taken = agent.respawn()
-        self.energy_map[agent.position[0], agent.position[1]] = agent.energy
+        x, y = agent.position
+        i = x * self.height + y  # Index on flat grids.
+        self.total_energy += agent.energy - self.energy_flat[i]
+        self.energy_flat[i] = agent.energy
+        self.agent_energy[agent.idx] = agent.energy
 
         return energy_taken
 
@@ -518,20 +591,16 @@ class World:
                 self.user_break = True
                 self.paused = self.step_by_step = False
         elif key == ord('\t'):  # Track a different agent.
-            initial_idx = idx = self.agents.index(self.tracked_agent)
-            next_agent = None
-            end_search = False
-            while not end_search:
-                # Pick next index, and its corresponding agent.
-                if idx == len(self.agents) - 1:
-                    idx = 0
-                else:
-                    idx += 1
-                next_agent = self.agents[idx]
-                # Check if valid [alive and no void 'action'], or if full cycle is complete.
-                if (next_agent.action is not None and next_agent.energy > 0) or idx == initial_idx:
-                    end_search = True
-            self.tracked_agent = next_agent
+            # Next valid one [alive and no void 'action'] by agent.idx (a stable order),
+            # keeping the current one if none is found.
+            n_agents = len(self.agents_by_idx)
+            idx = self.tracked_agent.idx
+            for _ in range(n_agents - 1):
+                idx = (idx + 1) % n_agents
+                next_agent = self.agents_by_idx[idx]
+                if next_agent.action is not None and next_agent.energy > 0:
+                    self.tracked_agent = next_agent
+                    break
         else:
             self.paused = False
             self.step_by_step = False